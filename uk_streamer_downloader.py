@@ -9,10 +9,10 @@ Requirements:
 - N_m3u8DL-RE (for downloading and decryption)
 - ffmpeg (for muxing)
 - selenium with Firefox webdriver
-- requests, beautifulsoup4
+- urllib3, lxml
 
 Installation:
-pip install selenium requests beautifulsoup4 pycryptodome
+pip install selenium urllib3 lxml pycryptodome
 
 Usage:
 python uk_streamer_downloader.py
@@ -24,11 +24,16 @@ import re
 import json
 import time
 import base64
+import asyncio
+import shutil
+import struct
 import subprocess
 import argparse
-import requests
-import xml.etree.ElementTree as ET
-from bs4 import BeautifulSoup
+from functools import lru_cache
+from io import BytesIO
+from concurrent.futures import ThreadPoolExecutor
+import urllib3
+from lxml import etree
 from urllib.parse import urlparse, parse_qs
 from selenium import webdriver
 from selenium.webdriver.firefox.options import Options
@@ -49,11 +54,95 @@ HEADERS = {
     "Accept": "*/*"
 }
 
+# MPD elements that carry the Widevine PSSH
+MPD_NAMESPACES = {
+    "mpd": "urn:mpeg:dash:schema:mpd:2011",
+    "cenc": "urn:mpeg:cenc:2013"
+}
+CONTENT_PROTECTION_TAG = f"{{{MPD_NAMESPACES['mpd']}}}ContentProtection"
+CENC_PSSH_TAG = f"{{{MPD_NAMESPACES['cenc']}}}pssh"
+WIDEVINE_SCHEME_ID = "urn:uuid:edef8ba9-79d6-4ace-a3c8-27dcd51d21ed"
+
+# Compiled lookup for a <track> subtitle source in the player page
+SUBTITLE_TRACK_XPATH = etree.XPath('string(//track[@kind="subtitles"]/@src)')
+
+# Resource Timing scrape used to find manifest and subtitle requests; only the
+# URLs containing one of the given substrings are sent back over WebDriver
+NETWORK_JS = """
+    var patterns = arguments[0];
+    var performance = window.performance || window.mozPerformance || window.msPerformance || window.webkitPerformance || {};
+    var network = (performance.getEntries && performance.getEntries()) || [];
+    return network.map(function (e) { return e.name || ''; }).filter(function (name) {
+        return patterns.some(function (p) { return name.indexOf(p) !== -1; });
+    });
+"""
+
+# Fetch a URL from inside the page so the browser's connection and HTTP cache are reused;
+# like the player's own request this is uncredentialed, so CDNs sending "*" pass CORS
+FETCH_TEXT_JS = """
+    var done = arguments[arguments.length - 1];
+    fetch(arguments[0])
+        .then(function (r) { return r.ok ? r.text() : null; })
+        .then(done, function () { done(null); });
+"""
+
+# Program ID patterns used for output naming
+C4_PROGRAM_ID_RE = re.compile(r'/(\d+)(?:-\d+)?(?:/|$)')
+ALNUM_PROGRAM_ID_RE = re.compile(r'/([0-9a-zA-Z]+)(?:/|$)')
+
+# Per-service settings for URL detection and page analysis
+SERVICES = {
+    "channel4": {
+        "name": "Channel 4",
+        "domains": ("channel4.com", "all4.com"),
+        "mpd_match": (".mpd",),
+        "sub_match": (".vtt", "/subs."),
+        "program_id_re": C4_PROGRAM_ID_RE,
+        "fallback_sub_from_page": True
+    },
+    "itv": {
+        "name": "ITV",
+        "domains": ("itv.com", "itvx.com"),
+        "mpd_match": (".mpd", ".ism/"),
+        "sub_match": (".vtt", "/subs.", "subtitles"),
+        "program_id_re": ALNUM_PROGRAM_ID_RE,
+        "fallback_sub_from_page": False
+    },
+    "channel5": {
+        "name": "Channel 5",
+        "domains": ("channel5.com", "my5.tv"),
+        "mpd_match": (".mpd",),
+        "sub_match": (".vtt", "subtitles"),
+        "program_id_re": ALNUM_PROGRAM_ID_RE,
+        "fallback_sub_from_page": False
+    }
+}
+
+# Service detection: host domain -> SERVICES key
+SERVICE_BY_DOMAIN = {
+    domain: key for key, service in SERVICES.items() for domain in service["domains"]
+}
+
+@lru_cache(maxsize=64)
+def detect_service(url):
+    """Return the SERVICES key for a URL's host, or None if unsupported"""
+    host = urlparse(url).hostname or ""
+    for domain, key in SERVICE_BY_DOMAIN.items():
+        if host == domain or host.endswith("." + domain):
+            return key
+    return None
+
 class UKStreamerDownloader:
     def __init__(self, headless=True):
         self.setup_directories()
         self.driver = None
         self.headless = headless
+        self._kid_cache = {}
+        self._widevine_dirty = False
+        self.http = urllib3.PoolManager(maxsize=4, headers=HEADERS)
+        
+        # Load Widevine proxy data once; browser restarts must not discard unsaved keys
+        self.load_widevine_proxy_data()
         
     def setup_directories(self):
         """Create necessary directories if they don't exist"""
@@ -74,14 +163,21 @@ class UKStreamerDownloader:
         options.set_preference("browser.download.useDownloadDir", True)
         options.set_preference("browser.helperApps.neverAsk.saveToDisk", "application/octet-stream")
         
+        # Skip startup work that only slows down profile initialisation
+        options.set_preference("browser.startup.page", 0)
+        options.set_preference("browser.safebrowsing.malware.enabled", False)
+        options.set_preference("browser.safebrowsing.phishing.enabled", False)
+        options.set_preference("browser.safebrowsing.downloads.enabled", False)
+        options.set_preference("datareporting.healthreport.uploadEnabled", False)
+        options.set_preference("datareporting.policy.dataSubmissionEnabled", False)
+        options.set_preference("toolkit.telemetry.enabled", False)
+        options.set_preference("app.update.enabled", False)
+        
         service = Service(log_path=os.path.devnull)
         
         self.driver = webdriver.Firefox(options=options, service=service)
         self.driver.set_window_size(1200, 800)
         
-        # Load Widevine proxy data if available
-        self.load_widevine_proxy_data()
-        
         print("✅ Browser initialized")
         
     def load_widevine_proxy_data(self):
@@ -98,23 +194,40 @@ class UKStreamerDownloader:
             self.widevine_data = {}
             
     def save_widevine_proxy_data(self):
-        """Save Widevine proxy data for future use"""
+        """Save Widevine proxy data for future use if it has changed"""
+        if not self._widevine_dirty:
+            return
+            
+        # Write to a temporary file and swap it in so a crash never truncates the cache
+        tmp_path = WIDEVINE_PROXY_DATA_FILE + ".tmp"
         try:
-            with open(WIDEVINE_PROXY_DATA_FILE, 'w') as f:
-                json.dump(self.widevine_data, f, indent=2)
+            with open(tmp_path, 'w') as f:
+                json.dump(self.widevine_data, f, separators=(',', ':'))
+            os.replace(tmp_path, WIDEVINE_PROXY_DATA_FILE)
+            self._widevine_dirty = False
             print("✅ Saved Widevine proxy data")
         except Exception as e:
             print(f"❌ Error saving Widevine data: {e}")
             
+    def reset_browser(self):
+        """Clear session state so the open browser can be reused for another URL"""
+        try:
+            self.driver.delete_all_cookies()
+            self.driver.get("about:blank")
+        except Exception as e:
+            print(f"⚠️ Could not reset browser, restarting it: {e}")
+            self.close_browser()
+            
     def close_browser(self):
         """Close browser if open"""
         if self.driver:
             self.driver.quit()
             self.driver = None
             
-    def extract_channel4_data(self, url):
-        """Extract MPD URL, PSSH, and subtitle URL from Channel 4 page"""
-        print(f"🔍 Analyzing Channel 4 URL: {url}")
+    def extract_stream_data(self, url, service_key):
+        """Extract MPD URL, PSSH, and subtitle URL from a streaming service page"""
+        service = SERVICES[service_key]
+        print(f"🔍 Analyzing {service['name']} URL: {url}")
         
         if not self.driver:
             self.initialize_browser()
@@ -130,61 +243,46 @@ class UKStreamerDownloader:
             time.sleep(5)  # Allow time for video player to initialize
         except TimeoutException:
             print("❌ Timeout waiting for video player to load")
-            return None, None, None
+            return None
             
         # Capture network traffic
         mpd_url = None
+        mpd_bytes = None
         pssh = None
         subtitle_url = None
         
         # Check for .mpd requests in network logs
-        network_items = self.driver.execute_script("""
-            var performance = window.performance || window.mozPerformance || window.msPerformance || window.webkitPerformance || {};
-            var network = performance.getEntries() || [];
-            return network;
-        """)
-        
-        for item in network_items:
-            url = item.get('name', '')
-            if '.mpd' in url:
-                mpd_url = url
-            elif '.vtt' in url or '/subs.' in url:
-                subtitle_url = url
+        patterns = list(service['mpd_match'] + service['sub_match'])
+        network_urls = self.driver.execute_script(NETWORK_JS, patterns)
+        
+        for item_url in network_urls:
+            if any(m in item_url for m in service['mpd_match']):
+                mpd_url = item_url
+            elif any(m in item_url for m in service['sub_match']):
+                subtitle_url = item_url
         
         if not mpd_url:
             print("❌ Failed to detect MPD URL")
-            return None, None, None
+            return None
             
         # Fetch the MPD content to extract PSSH
         try:
-            response = requests.get(mpd_url, headers=HEADERS)
-            root = ET.fromstring(response.content)
-            # Extract PSSH from MPD
-            for elem in root.findall(".//{urn:mpeg:dash:schema:mpd:2011}ContentProtection[@schemeIdUri='urn:uuid:edef8ba9-79d6-4ace-a3c8-27dcd51d21ed']"):
-                for pssh_elem in elem.findall(".//{urn:mpeg:cenc:2013}pssh"):
-                    pssh = pssh_elem.text.strip()
-            
-            # If we didn't find the PSSH in standard format, look for it in a different format
-            if not pssh:
-                for elem in root.findall(".//*"):
-                    if "pssh" in elem.tag.lower() and elem.text:
-                        pssh = elem.text.strip()
-                        break
+            mpd_bytes = self.fetch_mpd(mpd_url)
+            pssh = self._parse_pssh(mpd_bytes)
         except Exception as e:
             print(f"❌ Error parsing MPD: {e}")
             
         # If we still don't have a subtitle URL, look for it in the page source
-        if not subtitle_url:
+        if not subtitle_url and service['fallback_sub_from_page']:
             try:
+                # Imported here so runs that find subtitles in the network log skip it
+                from lxml import html as lhtml
                 page_source = self.driver.page_source
-                soup = BeautifulSoup(page_source, 'html.parser')
-                subtitle_elems = soup.find_all('track', attrs={'kind': 'subtitles'})
-                if subtitle_elems:
-                    subtitle_url = subtitle_elems[0].get('src')
-                    if subtitle_url and not subtitle_url.startswith('http'):
-                        parsed_url = urlparse(url)
-                        base_url = f"{parsed_url.scheme}://{parsed_url.netloc}"
-                        subtitle_url = base_url + subtitle_url
+                subtitle_url = SUBTITLE_TRACK_XPATH(lhtml.fromstring(page_source)) or None
+                if subtitle_url and not subtitle_url.startswith('http'):
+                    parsed_url = urlparse(url)
+                    base_url = f"{parsed_url.scheme}://{parsed_url.netloc}"
+                    subtitle_url = base_url + subtitle_url
             except Exception as e:
                 print(f"❌ Error finding subtitles: {e}")
                 
@@ -194,173 +292,54 @@ class UKStreamerDownloader:
         
         # Extract program ID for naming
         program_id = None
-        match = re.search(r'/(\d+)(?:-\d+)?(?:/|$)', url)
+        match = service['program_id_re'].search(url)
         if match:
             program_id = match.group(1)
             
         return {
             "mpd_url": mpd_url,
+            "mpd_bytes": mpd_bytes,
             "pssh": pssh,
             "subtitle_url": subtitle_url,
             "program_id": program_id
         }
     
-    def extract_itv_data(self, url):
-        """Extract MPD URL, PSSH, and subtitle URL from ITV page"""
-        print(f"🔍 Analyzing ITV URL: {url}")
-        
-        if not self.driver:
-            self.initialize_browser()
-            
-        # Navigate to the page
-        self.driver.get(url)
-        
-        # Wait for the page to load and video to initialize
+    def fetch_mpd(self, mpd_url):
+        """Fetch MPD content through the browser, falling back to a direct request"""
         try:
-            WebDriverWait(self.driver, 30).until(
-                EC.presence_of_element_located((By.CSS_SELECTOR, "video"))
-            )
-            time.sleep(5)  # Allow time for video player to initialize
-        except TimeoutException:
-            print("❌ Timeout waiting for video player to load")
-            return None
-            
-        # Capture network traffic
-        mpd_url = None
-        pssh = None
-        subtitle_url = None
-        
-        # Check for .mpd requests in network logs
-        network_items = self.driver.execute_script("""
-            var performance = window.performance || window.mozPerformance || window.msPerformance || window.webkitPerformance || {};
-            var network = performance.getEntries() || [];
-            return network;
-        """)
-        
-        for item in network_items:
-            url = item.get('name', '')
-            if '.mpd' in url or '.ism/' in url:
-                mpd_url = url
-            elif '.vtt' in url or '/subs.' in url or 'subtitles' in url:
-                subtitle_url = url
-        
-        if not mpd_url:
-            print("❌ Failed to detect MPD URL")
-            return None
-            
-        # Fetch the MPD content to extract PSSH
-        try:
-            response = requests.get(mpd_url, headers=HEADERS)
-            root = ET.fromstring(response.content)
-            # Extract PSSH from MPD
-            for elem in root.findall(".//{urn:mpeg:dash:schema:mpd:2011}ContentProtection[@schemeIdUri='urn:uuid:edef8ba9-79d6-4ace-a3c8-27dcd51d21ed']"):
-                for pssh_elem in elem.findall(".//{urn:mpeg:cenc:2013}pssh"):
-                    pssh = pssh_elem.text.strip()
-            
-            # If we didn't find the PSSH in standard format, look for it in a different format
-            if not pssh:
-                for elem in root.findall(".//*"):
-                    if "pssh" in elem.tag.lower() and elem.text:
-                        pssh = elem.text.strip()
-                        break
+            mpd_text = self.driver.execute_async_script(FETCH_TEXT_JS, mpd_url)
+            if mpd_text:
+                return mpd_text.encode('utf-8')
         except Exception as e:
-            print(f"❌ Error parsing MPD: {e}")
+            print(f"⚠️ Browser fetch of MPD failed, retrying directly: {e}")
             
-        # Extract program ID for naming
-        program_id = None
-        match = re.search(r'/([0-9a-zA-Z]+)(?:/|$)', url)
-        if match:
-            program_id = match.group(1)
-            
-        print(f"✅ MPD URL: {mpd_url}")
-        print(f"✅ PSSH: {pssh[:20]}..." if pssh else "❌ PSSH not found")
-        print(f"✅ Subtitle URL: {subtitle_url}" if subtitle_url else "⚠️ No subtitles found")
-        
-        return {
-            "mpd_url": mpd_url,
-            "pssh": pssh,
-            "subtitle_url": subtitle_url,
-            "program_id": program_id
-        }
-        
-    def extract_channel5_data(self, url):
-        """Extract MPD URL, PSSH, and subtitle URL from Channel 5 page"""
-        print(f"🔍 Analyzing Channel 5 URL: {url}")
-        
-        if not self.driver:
-            self.initialize_browser()
-            
-        # Navigate to the page
-        self.driver.get(url)
-        
-        # Wait for the page to load and video to initialize
-        try:
-            WebDriverWait(self.driver, 30).until(
-                EC.presence_of_element_located((By.CSS_SELECTOR, "video"))
-            )
-            time.sleep(5)  # Allow time for video player to initialize
-        except TimeoutException:
-            print("❌ Timeout waiting for video player to load")
-            return None
-            
-        # Capture network traffic
-        mpd_url = None
-        pssh = None
-        subtitle_url = None
-        
-        # Check for .mpd requests in network logs
-        network_items = self.driver.execute_script("""
-            var performance = window.performance || window.mozPerformance || window.msPerformance || window.webkitPerformance || {};
-            var network = performance.getEntries() || [];
-            return network;
-        """)
-        
-        for item in network_items:
-            url = item.get('name', '')
-            if '.mpd' in url:
-                mpd_url = url
-            elif '.vtt' in url or 'subtitles' in url:
-                subtitle_url = url
-        
-        if not mpd_url:
-            print("❌ Failed to detect MPD URL")
-            return None
-            
-        # Fetch the MPD content to extract PSSH
-        try:
-            response = requests.get(mpd_url, headers=HEADERS)
-            root = ET.fromstring(response.content)
-            # Extract PSSH from MPD
-            for elem in root.findall(".//{urn:mpeg:dash:schema:mpd:2011}ContentProtection[@schemeIdUri='urn:uuid:edef8ba9-79d6-4ace-a3c8-27dcd51d21ed']"):
-                for pssh_elem in elem.findall(".//{urn:mpeg:cenc:2013}pssh"):
-                    pssh = pssh_elem.text.strip()
-            
-            # If we didn't find the PSSH in standard format, look for it in a different format
-            if not pssh:
-                for elem in root.findall(".//*"):
-                    if "pssh" in elem.tag.lower() and elem.text:
-                        pssh = elem.text.strip()
-                        break
-        except Exception as e:
-            print(f"❌ Error parsing MPD: {e}")
-            
-        # Extract program ID for naming
-        program_id = None
-        match = re.search(r'/([0-9a-zA-Z]+)(?:/|$)', url)
-        if match:
-            program_id = match.group(1)
-            
-        print(f"✅ MPD URL: {mpd_url}")
-        print(f"✅ PSSH: {pssh[:20]}..." if pssh else "❌ PSSH not found")
-        print(f"✅ Subtitle URL: {subtitle_url}" if subtitle_url else "⚠️ No subtitles found")
+        response = self.http.request('GET', mpd_url)
+        if response.status >= 400:
+            raise urllib3.exceptions.HTTPError(f"HTTP {response.status} fetching MPD")
+        return response.data
+    
+    def _parse_pssh(self, mpd_bytes):
+        """Return the Widevine PSSH from an MPD manifest, or None"""
+        # Stream through pssh elements only and stop at the first Widevine one,
+        # so the rest of the manifest (segment timelines etc.) is never built
+        fallback_pssh = None
+        context = etree.iterparse(BytesIO(mpd_bytes), events=('end',), tag='{*}pssh')
+        for _, elem in context:
+            text = elem.text.strip() if elem.text else None
+            if not text:
+                continue
+            parent = elem.getparent()
+            if (elem.tag == CENC_PSSH_TAG and parent is not None
+                    and parent.tag == CONTENT_PROTECTION_TAG
+                    and parent.get('schemeIdUri') == WIDEVINE_SCHEME_ID):
+                return text
+            
+            # If we don't find the PSSH in standard format, use the first one in any format
+            if fallback_pssh is None:
+                fallback_pssh = text
+                
+        return fallback_pssh
         
-        return {
-            "mpd_url": mpd_url,
-            "pssh": pssh,
-            "subtitle_url": subtitle_url,
-            "program_id": program_id
-        }
-
     def get_drm_key(self, pssh, url, service_name):
         """Get DRM key for the given PSSH"""
         if not pssh:
@@ -378,9 +357,12 @@ class UKStreamerDownloader:
             
         # Decode PSSH to extract KID
         try:
-            pssh_bytes = base64.b64decode(pssh)
-            # The KID is typically at bytes 32-48 in the PSSH box
-            kid = pssh_bytes[32:48].hex()
+            kid = self._kid_cache.get(pssh)
+            if kid is None:
+                pssh_bytes = base64.b64decode(pssh, validate=False)
+                # The KID is typically at bytes 32-48 in the PSSH box
+                kid = struct.unpack_from('16s', pssh_bytes, 32)[0].hex()
+                self._kid_cache[pssh] = kid
             print(f"✅ Extracted KID from PSSH: {kid}")
         except Exception as e:
             print(f"❌ Error extracting KID from PSSH: {e}")
@@ -425,6 +407,7 @@ class UKStreamerDownloader:
             key = key.strip().lower()
             
             self.widevine_data[pssh] = key_input
+            self._widevine_dirty = True
             self.save_widevine_proxy_data()
             return key_input
         else:
@@ -437,16 +420,19 @@ class UKStreamerDownloader:
             return None
             
         try:
-            response = requests.get(subtitle_url, headers=HEADERS)
-            with open(output_path, 'wb') as f:
-                f.write(response.content)
+            response = self.http.request('GET', subtitle_url, preload_content=False)
+            try:
+                with open(output_path, 'wb') as f:
+                    shutil.copyfileobj(response, f, length=1024 * 1024)
+            finally:
+                response.release_conn()
             print(f"✅ Subtitle downloaded to: {output_path}")
             return output_path
         except Exception as e:
             print(f"❌ Error downloading subtitle: {e}")
             return None
     
-    def download_and_decrypt(self, mpd_url, drm_key, output_name, subtitle_path=None):
+    def download_and_decrypt(self, mpd_url, drm_key, output_name, subtitle_future=None, mpd_path=None):
         """Download and decrypt video using N_m3u8DL-RE"""
         print(f"📥 Downloading and decrypting video...")
         
@@ -457,7 +443,7 @@ class UKStreamerDownloader:
         # Build the command
         cmd = [
             "dotnet", N_M3U8DL_RE_PATH,
-            "--url", mpd_url,
+            "--url", mpd_path or mpd_url,
             "--key", drm_key,
             "--saveName", output_name,
             "--workDir", output_dir,
@@ -466,6 +452,10 @@ class UKStreamerDownloader:
             "--binaryMerge"
         ]
         
+        # A local manifest copy still needs the original URL to resolve segments
+        if mpd_path:
+            cmd.extend(["--baseUrl", mpd_url])
+        
         # Add custom headers if needed
         cmd.extend(["--header", f"User-Agent: {USER_AGENT}"])
         cmd.extend(["--header", "Accept: */*"])
@@ -473,15 +463,10 @@ class UKStreamerDownloader:
         
         try:
             print(f"🧰 Running N_m3u8DL-RE...")
-            process = subprocess.Popen(cmd, stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True)
-            
-            # Read and display output in real-time
-            for line in process.stdout:
-                print(line.strip())
-                
-            process.wait()
+            # Display output in real-time while collecting stderr
+            returncode, error = asyncio.run(self._run_and_relay(cmd))
             
-            if process.returncode == 0:
+            if returncode == 0:
                 # Check if the output file was created
                 expected_output = os.path.join(output_dir, f"{output_name}.mkv")
                 if not os.path.exists(expected_output):
@@ -491,79 +476,110 @@ class UKStreamerDownloader:
                 if os.path.exists(expected_output):
                     print(f"✅ Video downloaded and decrypted: {expected_output}")
                     
-                    # If we have subtitles, mux them into the video
-                    if subtitle_path and os.path.exists(subtitle_path):
-                        self.mux_subtitle_into_video(expected_output, subtitle_path)
-                    
-                    # Move the final file to the main download directory
                     final_output = os.path.join(DOWNLOAD_DIR, f"{output_name}_FINAL.mkv")
-                    os.rename(expected_output, final_output)
+                    
+                    # If we have subtitles, mux them straight into the final file;
+                    # otherwise move the video to the main download directory
+                    muxed = False
+                    # Wait for the subtitle download only now that it is needed
+                    subtitle_path = subtitle_future.result() if subtitle_future else None
+                    if subtitle_path and os.path.exists(subtitle_path):
+                        muxed = self.mux_subtitle_into_video(expected_output, subtitle_path, final_output)
+                    if not muxed:
+                        os.replace(expected_output, final_output)
                     print(f"✅ Final output: {final_output}")
                     return final_output
                 else:
                     print(f"❌ Expected output file not found: {expected_output}")
             else:
-                error = process.stderr.read()
-                print(f"❌ N_m3u8DL-RE failed with return code {process.returncode}")
-                print(f"Error: {error}")
+                print(f"❌ N_m3u8DL-RE failed with return code {returncode}")
+                print(f"Error: {error.decode(errors='replace')}")
                 
         except Exception as e:
             print(f"❌ Error running N_m3u8DL-RE: {e}")
             
         return None
     
-    def mux_subtitle_into_video(self, video_path, subtitle_path):
-        """Mux subtitle into video using ffmpeg"""
+    async def _run_and_relay(self, cmd):
+        """Run a command, copying its stdout to ours as it arrives; return (returncode, stderr bytes)"""
+        sys.stdout.flush()
+        process = await asyncio.create_subprocess_exec(
+            *cmd, stdout=asyncio.subprocess.PIPE, stderr=asyncio.subprocess.PIPE
+        )
+        stderr_data = BytesIO()
+        
+        # Drain both pipes concurrently so neither can fill up and stall the child
+        await asyncio.gather(
+            self._drain_stream(process.stdout, sys.stdout.buffer),
+            self._drain_stream(process.stderr, stderr_data),
+            process.wait()
+        )
+        return process.returncode, stderr_data.getvalue()
+    
+    async def _drain_stream(self, stream, sink):
+        """Copy an asyncio stream into a binary sink in 64 KiB chunks until EOF"""
+        while True:
+            chunk = await stream.read(65536)
+            if not chunk:
+                break
+            sink.write(chunk)
+            sink.flush()
+    
+    def mux_subtitle_into_video(self, video_path, subtitle_path, output_path):
+        """Mux subtitle into video using ffmpeg, writing the result to output_path"""
         print(f"🔄 Muxing subtitle into video...")
         
-        output_path = os.path.splitext(video_path)[0] + "_with_subs.mkv"
+        # Write next to the destination so the final move is an atomic rename
+        partial_path = output_path + ".part"
         
         cmd = [
-            "ffmpeg",
+            "ffmpeg", "-y",
             "-i", video_path,
             "-i", subtitle_path,
             "-c", "copy",
-            "-c:s", "mov_text",
-            output_path
+            "-c:s", "copy",
+            "-f", "matroska",
+            partial_path
         ]
         
         try:
             subprocess.run(cmd, check=True, capture_output=True, text=True)
-            print(f"✅ Muxed video with subtitles: {output_path}")
-            
-            # Replace the original file with the one with subtitles
+            os.replace(partial_path, output_path)
             os.remove(video_path)
-            os.rename(output_path, video_path)
+            print(f"✅ Muxed video with subtitles: {output_path}")
+            return True
             
         except subprocess.CalledProcessError as e:
             print(f"❌ Error muxing subtitle: {e}")
             print(f"ffmpeg stderr: {e.stderr}")
+            if os.path.exists(partial_path):
+                os.remove(partial_path)
+            return False
     
     def process_url(self, url):
         """Process a URL from any supported streaming service"""
+        # Accept pasted URLs without a scheme, e.g. "www.itv.com/watch/..."
+        url = url.strip()
+        if "://" not in url:
+            url = "https://" + url
+            
         print(f"\n🎬 PROCESSING URL: {url}")
         
+        # Reuse the browser from a previous URL rather than starting a new one
+        if self.driver:
+            self.reset_browser()
+            
         # Detect the service type
-        service_name = None
-        extract_func = None
-        
-        if "channel4.com" in url or "all4.com" in url:
-            service_name = "Channel 4"
-            extract_func = self.extract_channel4_data
-        elif "itv.com" in url or "itvx.com" in url:
-            service_name = "ITV"
-            extract_func = self.extract_itv_data
-        elif "channel5.com" in url or "my5.tv" in url:
-            service_name = "Channel 5"
-            extract_func = self.extract_channel5_data
-        else:
+        service_key = detect_service(url)
+        if not service_key:
             print(f"❌ Unsupported URL: {url}")
             print("   Supported services: Channel 4, ITV, Channel 5")
             return False
             
         # Extract data
+        service_name = SERVICES[service_key]['name']
         print(f"🔍 Detected service: {service_name}")
-        data = extract_func(url)
+        data = self.extract_stream_data(url, service_key)
         
         if not data or not data.get("mpd_url"):
             print("❌ Failed to extract required data from URL")
@@ -580,19 +596,28 @@ class UKStreamerDownloader:
         program_id = data.get("program_id", "program")
         output_name = f"{service_name.replace(' ', '')}-{program_id}-{timestamp}"
         
-        # Download subtitle if available
-        subtitle_path = None
-        if data.get("subtitle_url"):
-            subtitle_output = os.path.join(TEMP_DIR, f"{output_name}.vtt")
-            subtitle_path = self.download_subtitle(data["subtitle_url"], subtitle_output)
-            
-        # Download and decrypt video
-        output_file = self.download_and_decrypt(
-            data["mpd_url"], 
-            drm_key, 
-            output_name,
-            subtitle_path
-        )
+        # Reuse the manifest we already fetched instead of downloading it again
+        mpd_path = None
+        if data.get("mpd_bytes"):
+            mpd_path = os.path.join(TEMP_DIR, f"{output_name}.mpd")
+            with open(mpd_path, 'wb') as f:
+                f.write(data["mpd_bytes"])
+                
+        with ThreadPoolExecutor(max_workers=1) as executor:
+            # Download subtitle if available, alongside the video download
+            subtitle_future = None
+            if data.get("subtitle_url"):
+                subtitle_output = os.path.join(TEMP_DIR, f"{output_name}.vtt")
+                subtitle_future = executor.submit(self.download_subtitle, data["subtitle_url"], subtitle_output)
+                
+            # Download and decrypt video
+            output_file = self.download_and_decrypt(
+                data["mpd_url"], 
+                drm_key, 
+                output_name,
+                subtitle_future,
+                mpd_path
+            )
         
         if output_file:
             print(f"\n✅ DOWNLOAD COMPLETE!")
@@ -605,20 +630,17 @@ class UKStreamerDownloader:
     def cleanup(self):
         """Clean up temporary files"""
         print("🧹 Cleaning up temporary files...")
+        self.save_widevine_proxy_data()
         self.close_browser()
+        self.http.clear()
         
-        # Keep temp directory but remove its contents
-        for file in os.listdir(TEMP_DIR):
-            file_path = os.path.join(TEMP_DIR, file)
-            try:
-                if os.path.isfile(file_path):
-                    os.unlink(file_path)
-            except Exception as e:
-                print(f"❌ Error deleting {file_path}: {e}")
+        # Keep temp directory but remove its contents, including subfolders
+        shutil.rmtree(TEMP_DIR, ignore_errors=True)
+        os.makedirs(TEMP_DIR, exist_ok=True)
                 
 def main():
     parser = argparse.ArgumentParser(description="UK Streaming Service Downloader")
-    parser.add_argument("--url", type=str, help="URL of the show to download")
+    parser.add_argument("--url", type=str, action="append", help="URL of the show to download (repeat for several)")
     parser.add_argument("--no-headless", action="store_true", help="Disable headless browser mode")
     args = parser.parse_args()
     
@@ -642,12 +664,13 @@ def main():
     
     try:
         if args.url:
-            url = args.url
+            urls = args.url
         else:
-            url = input("📎 Please paste the show URL: ")
+            urls = [input("📎 Please paste the show URL: ")]
             
-        # Process the URL
-        downloader.process_url(url)
+        # Process the URLs, sharing one browser session
+        for url in urls:
+            downloader.process_url(url)
             
     except KeyboardInterrupt:
         print("\n⚠️ Operation cancelled by user")